@@ -0,0 +1,44 @@
+"""
+Numba compiled kernels for the simulation hot loops.
+
+Kernels are compiled for explicit signatures when this module is imported and
+cached to disk, so only the first run after a code change pays for compilation.
+"""
+import numpy as np
+from numba import njit, prange
+
+from battery import STATE_SIGN
+
+# array copy of STATE_SIGN, which numba can index and vectorise over
+_STATE_SIGN = np.array(STATE_SIGN)
+
+
+_ADVANCE_SIGNATURE = "void(i1[::1], f8[::1], f8[::1], f8[:, ::1], f8[:, ::1], i8)"
+
+
+@njit(_ADVANCE_SIGNATURE, cache=True, fastmath=True)
+def advance_batteries(states, powers, caps, inputs, outputs, t):
+    """
+    Advances each battery by one time increment, recording its input or
+    output in column t of the site history.
+    """
+    for i in range(states.shape[0]):
+        change = _STATE_SIGN[states[i]] * powers[i]
+        caps[i] += change
+        inputs[i, t] = max(change, 0.0)
+        outputs[i, t] = max(-change, 0.0)
+
+
+@njit(_ADVANCE_SIGNATURE, cache=True, fastmath=True, parallel=True)
+def advance_batteries_parallel(states, powers, caps, inputs, outputs, t):
+    """
+    Same as advance_batteries, but splits the batteries across threads.
+
+    Starting the threads costs more than it saves for small sites, so this is
+    only worth using for sites with many batteries on a multi-core machine.
+    """
+    for i in prange(states.shape[0]):
+        change = _STATE_SIGN[states[i]] * powers[i]
+        caps[i] += change
+        inputs[i, t] = max(change, 0.0)
+        outputs[i, t] = max(-change, 0.0)
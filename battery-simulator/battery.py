@@ -1,24 +1,42 @@
 """
 Code covering battery classes and core functions
 """
+import itertools
+import math
 from abc import ABC
-from decimal import Decimal
-from enum import Enum, auto
+from enum import IntEnum
+
+import numpy as np
+
+# initial number of time increments held in a battery or site history (one day)
+HISTORY_CHUNK = 1440
+
+
+_battery_id_counter = itertools.count()
 
 
 def generate_battery_id():
-    return "abcdfgt"
+    """
+    Generate a unique battery identifier
+    """
+    return next(_battery_id_counter)
 
 
-class BatteryState(Enum):
+class BatteryState(IntEnum):
     """
     Class responsible for enumerating the possible
     states a battery can be in.
+
+    States are integers so they can be held in numpy arrays.
     """
 
-    CHARGING = auto()
-    DISCHARGING = auto()
-    IDLE = auto()
+    IDLE = 0
+    CHARGING = 1
+    DISCHARGING = 2
+
+
+# direction of energy flow into the battery for each state, indexed by state
+STATE_SIGN = (0.0, 1.0, -1.0)
 
 
 # TODO:
@@ -58,22 +76,44 @@ class Battery(ABC):
     behaviour and reporting battery state.
     """
 
-    def __init__(self, battery_inputs=None, battery_outputs=None) -> None:
+    __slots__ = (
+        "battery_id",
+        "_input_total",
+        "_output_total",
+        "_history",
+        "_history_len",
+        "_site",
+        "idx",
+        "_energy_capacity",
+        "_power_capacity",
+        "_power_per_minute",
+        "_state",
+    )
+
+    def __init__(
+        self, battery_inputs=None, battery_outputs=None, record_history=False
+    ) -> None:
         self.battery_id = generate_battery_id()
 
-        if battery_inputs is None:
-            self.battery_inputs = []
-        else:
-            self.battery_inputs = battery_inputs
+        # running totals of the energy put into and taken out of the battery
+        self._input_total = math.fsum(battery_inputs or [])
+        self._output_total = math.fsum(battery_outputs or [])
 
-        if battery_outputs is None:
-            self.battery_outputs = []
+        # net energy moved at each increment, only kept if asked for
+        if record_history:
+            self._history = np.zeros(HISTORY_CHUNK)
         else:
-            self.battery_outputs = battery_outputs
+            self._history = None
+        self._history_len = 0
+
+        # set by the Site the battery belongs to, if any. Once set, the site
+        # holds the battery charge level and increments it
+        self._site = None
+        self.idx = None
 
     # energy capacity
     @property
-    def energy_capacity(self) -> Decimal:
+    def energy_capacity(self) -> float:
         """
         The maximum amount of stored energy in kilowatt-hours [kWh]
         """
@@ -85,26 +125,38 @@ class Battery(ABC):
             raise ValueError("Energy capacity cannot be negative")
         self._energy_capacity = value
 
+        if self._site is not None:
+            self._site._energy_capacity = math.fsum(
+                b.energy_capacity for b in self._site.batteries
+            )
+
     # current capacity
     @property
-    def current_capacity(self):
+    def current_capacity(self) -> float:
         """
         The total current charge level in kWh.
+
+        Maintained incrementally by increment() rather than summed from the
+        input and output history on every access.
         """
-        return sum(self.battery_inputs) - sum(self.battery_outputs)
+        if self._site is not None:
+            return float(self._site._caps[self.idx])
+        return self._input_total - self._output_total
 
     # state of charge
     @property
-    def state_of_charge(self):
+    def state_of_charge(self) -> float:
         """
         The total current charge as a fraction of total battery
         capacity.
         """
-        return self.current_capacity / self.energy_capacity
+        if self._site is not None:
+            return float(self._site._caps[self.idx]) / self._energy_capacity
+        return (self._input_total - self._output_total) / self._energy_capacity
 
     # power capacity
     @property
-    def power_capacity(self) -> Decimal:
+    def power_capacity(self) -> float:
         """
         The total possible instantaneous charge/discharge capability,
         in kilowatts, of the Battery. In other words, the maximum rate
@@ -120,10 +172,18 @@ class Battery(ABC):
             raise ValueError("Power capacity cannot be zero")
 
         self._power_capacity = value
+        # energy moved in a single one minute increment
+        self._power_per_minute = value / 60
+
+        if self._site is not None:
+            self._site._power_per_minute[self.idx] = self._power_per_minute
+            self._site._power_capacity = math.fsum(
+                b.power_capacity for b in self._site.batteries
+            )
 
     # storage duration
     @property
-    def storage_duration(self) -> Decimal:
+    def storage_duration(self) -> float:
         """
         The amount of time the battery can discharge at its
         power capacity before depleting its energy capacity.
@@ -145,10 +205,33 @@ class Battery(ABC):
     @state.setter
     def state(self, state_value: BatteryState):
         self._state = state_value
+        if self._site is not None:
+            self._site._states[self.idx] = state_value
+            self._site._state_dirty = True
 
-    # battery inputs
+    # battery history
+    @property
+    def history(self):
+        """
+        The net energy moved into the battery at each time increment, in kWh.
+        Discharging increments are negative.
+
+        None unless the battery was created with record_history=True. Once
+        the battery is in a site, later increments are read from the site
+        history.
+        """
+        if self._history is None:
+            return None
+
+        history = self._history[: self._history_len]
+        if self._site is not None:
+            t = self._site._timestep
+            site_history = (
+                self._site._inputs[self.idx, :t] - self._site._outputs[self.idx, :t]
+            )
+            history = np.concatenate((history, site_history))
 
-    # battery outputs
+        return history
 
     # charge and discharge methods
     def charge(self):
@@ -210,18 +293,30 @@ class Battery(ABC):
 
         This is always called at the beginning of each time increment.
 
+        Batteries belonging to a site are incremented together by
+        Site.increment() instead.
         """
 
-        if self.state == BatteryState.CHARGING:
-            self.battery_inputs.append(Decimal(self.power_capacity) / 60)
-        elif self.state == BatteryState.DISCHARGING:
-            self.battery_outputs.append(Decimal(self.power_capacity) / 60)
-        else:
-            pass
+        if self._site is not None:
+            raise RuntimeError(
+                f"{self.battery_id} - Battery belongs to a site and is "
+                "incremented by the site"
+            )
+
+        delta = STATE_SIGN[self._state] * self._power_per_minute
+
+        self._input_total += max(delta, 0.0)
+        self._output_total += max(-delta, 0.0)
+
+        if self._history is not None:
+            if self._history_len == len(self._history):
+                self._history = np.hstack((self._history, np.zeros_like(self._history)))
+            self._history[self._history_len] = delta
+            self._history_len += 1
 
     def __str__(self) -> str:
         return f"""
-            State: {self.state} \n
+            State: {self.state.name} \n
             Current capacity: {self.current_capacity} \n
             Current state of charge: {self.state_of_charge}"""
 
@@ -234,12 +329,14 @@ class GridBattery(Battery):
     Standard single grid storage battery
     """
 
-    def __init__(self):
-        self.energy_capacity = Decimal(5000)
-        self.power_capacity = Decimal(2500)
+    __slots__ = ("cycle_rate",)
+
+    def __init__(self, record_history=False):
+        super().__init__([5000.0], [0.0], record_history=record_history)
+        self.energy_capacity = 5000.0
+        self.power_capacity = 2500.0
         self.state = BatteryState.IDLE
         self.cycle_rate = 0
-        super().__init__([5000], [0])
 
 
 if __name__ == "__main__":
@@ -1,9 +1,12 @@
 from abc import ABC, abstractmethod
-from decimal import Decimal
-from random import randint
-from typing import List
+from random import randrange
 
-from battery import Battery, BatteryState
+import numpy as np
+
+from battery import BatteryState
+
+# Strategy methods take a site.Site. It isn't imported for annotations as
+# site.py shares its name with the standard library site module.
 
 
 class SiteChargingStrategy(ABC):
@@ -14,14 +17,16 @@ class SiteChargingStrategy(ABC):
     based on a given logic
     """
 
+    __slots__ = ()
+
     @abstractmethod
-    def determine_charge_battery(self, charge_rate: Decimal, batteries: List[Battery]):
+    def determine_charge_battery(self, charge_rate: float, site):
         """
         Defines which battery or batteries to charge
         """
 
     @abstractmethod
-    def determine_discharge_battery(self, discharge_rate: Decimal, batteries: List[Battery]):
+    def determine_discharge_battery(self, discharge_rate: float, site):
         """
         Defines which battery or batteries to charge
         """
@@ -33,30 +38,24 @@ class LowestToHighestChargingStrategy(SiteChargingStrategy):
     discharges and most full battery(s)
     """
 
+    __slots__ = ()
+
     def __init__(self):
         pass
 
-    def determine_charge_battery(self, charge_rate: Decimal, batteries: List[Battery]):
+    def determine_charge_battery(self, charge_rate: float, site):
         """
         Finds the battery with the lowest charge level and tells it to charge
         """
-        lowest_charge = min(
-            [
-                battery.current_capacity
-                for battery in batteries
-                if battery.state != BatteryState.CHARGING
-            ]
-        )
-
-        eligible_batteries = [
-            battery
-            for battery in batteries
-            if battery.current_capacity == lowest_charge
-        ]
-
-        return eligible_batteries[0]
-
-    def determine_discharge_battery(self, discharge_rate: Decimal, batteries: List[Battery]):
+        eligible = site._states != BatteryState.CHARGING
+        if not eligible.any():
+            raise ValueError("No battery is available to charge")
+
+        idx = np.argmin(np.where(eligible, site._caps, np.inf))
+
+        return site.batteries[idx]
+
+    def determine_discharge_battery(self, discharge_rate: float, site):
         """
         Finds the battery with the highest charge level.
 
@@ -67,21 +66,13 @@ class LowestToHighestChargingStrategy(SiteChargingStrategy):
         If there are multiple batteries eligible but only one needed, returns only one.
         """
 
-        highest_charge = max(
-            [
-                battery.current_capacity
-                for battery in batteries
-                if battery.state != BatteryState.DISCHARGING
-            ]
-        )
+        eligible = site._states != BatteryState.DISCHARGING
+        if not eligible.any():
+            raise ValueError("No battery is available to discharge")
 
-        eligible_batteries = [
-            battery
-            for battery in batteries
-            if battery.current_capacity == highest_charge
-        ]
+        idx = np.argmax(np.where(eligible, site._caps, -np.inf))
 
-        return eligible_batteries[0]
+        return site.batteries[idx]
 
 
 class RandomChargingStrategy(SiteChargingStrategy):
@@ -89,29 +80,27 @@ class RandomChargingStrategy(SiteChargingStrategy):
     Selects a random battery to charge, regardless of charging state
     """
 
+    __slots__ = ()
+
     def __init__(self):
         pass
 
-    def determine_charge_battery(self, batteries: List[Battery]):
+    def determine_charge_battery(self, charge_rate: float, site):
         """
         Finds a random battery to charge that isn't currently charging
         """
-        eligible_batteries = [
-            battery
-            for battery in batteries
-            if battery.state != BatteryState.CHARGING
-        ]
+        eligible = np.flatnonzero(site._states != BatteryState.CHARGING)
+        if len(eligible) == 0:
+            raise ValueError("No battery is available to charge")
 
-        return eligible_batteries[randint(0, len(eligible_batteries))]
+        return site.batteries[eligible[randrange(len(eligible))]]
 
-    def determine_discharge_battery(self, batteries: List[Battery]):
+    def determine_discharge_battery(self, discharge_rate: float, site):
         """
         Finds a random battery to discharge that isn't currently discharging
         """
-        eligible_batteries = [
-            battery
-            for battery in batteries
-            if battery.state != BatteryState.DISCHARGING
-        ]
+        eligible = np.flatnonzero(site._states != BatteryState.DISCHARGING)
+        if len(eligible) == 0:
+            raise ValueError("No battery is available to discharge")
 
-        return eligible_batteries[randint(0, len(eligible_batteries))]
+        return site.batteries[eligible[randrange(len(eligible))]]
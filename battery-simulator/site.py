@@ -4,10 +4,13 @@ Code relating to batery sites.
 A site is a collection of batteries
 """
 
-from decimal import Decimal
+import math
 from typing import List
 
-from battery import Battery, BatteryState
+import numpy as np
+
+from _kernels import advance_batteries, advance_batteries_parallel
+from battery import HISTORY_CHUNK, Battery, BatteryState
 
 
 def generate_site_id():
@@ -25,11 +28,70 @@ class Site:
     and subjected to the same charging strategy.
     """
 
-    def __init__(self, batteries: List[Battery], location: str):
+    __slots__ = (
+        "site_id",
+        "location",
+        "batteries",
+        "_energy_capacity",
+        "_power_capacity",
+        "_states",
+        "_power_per_minute",
+        "_caps",
+        "_state_dirty",
+        "_state_cache",
+        "_timestep",
+        "_inputs",
+        "_outputs",
+        "_power_input",
+        "_power_input_len",
+        "_advance",
+    )
+
+    def __init__(self, batteries: List[Battery], location: str, parallel: bool = False):
+        for battery in batteries:
+            if battery._site is not None:
+                raise ValueError(
+                    f"{battery.battery_id} - Battery already belongs to a site"
+                )
+
         self.site_id = generate_site_id()
         self.location = location
         self.batteries = batteries
 
+        # threaded kernel only pays off for large sites on multi-core machines
+        if parallel:
+            self._advance = advance_batteries_parallel
+        else:
+            self._advance = advance_batteries
+
+        # totals are summed once here and again only when a battery's
+        # capacity setter is used
+        self._energy_capacity = math.fsum(b.energy_capacity for b in batteries)
+        self._power_capacity = math.fsum(b.power_capacity for b in batteries)
+
+        # per battery state, energy moved per increment and charge level
+        self._states = np.array([b.state for b in batteries], np.int8)
+        self._power_per_minute = np.array([b._power_per_minute for b in batteries])
+        self._caps = np.array([b.current_capacity for b in batteries])
+
+        # site state is only recomputed after a battery changes state
+        self._state_dirty = True
+        self._state_cache = None
+
+        # per battery input and output history, one row per battery and
+        # one column per time increment
+        self._timestep = 0
+        self._inputs = np.zeros((len(batteries), HISTORY_CHUNK))
+        self._outputs = np.zeros((len(batteries), HISTORY_CHUNK))
+
+        # site power input for the increments summed so far
+        self._power_input = np.zeros(HISTORY_CHUNK)
+        self._power_input_len = 0
+
+        for idx, battery in enumerate(batteries):
+            battery._site = self
+            battery.idx = idx
+
     def __post_init__(self):
         """
         Initialise the batteries within the site after the site is created
@@ -37,29 +99,29 @@ class Site:
         raise NotImplementedError
 
     @property
-    def energy_capacity(self) -> Decimal:
+    def energy_capacity(self) -> float:
         """
         The total maximum energy capacity of the site.
 
         Defined as the sum of the energy capacities for the constituent batteries
         """
-        return Decimal(sum([battery.energy_capacity for battery in self.batteries]))
+        return self._energy_capacity
 
     @property
-    def current_capacity(self) -> Decimal:
+    def current_capacity(self) -> float:
         """
         Calculates the current energy contained within the site batteries
         """
-        return Decimal(sum([battery.current_capacity for battery in self.batteries]))
+        return float(self._caps.sum())
 
     @property
-    def power_capacity(self) -> Decimal:
+    def power_capacity(self) -> float:
         """
         The total possble instantaneous charge/discharge capability of the site.
 
         The sum of the power capacity of the site batteries
         """
-        return Decimal(sum([battery.power_capacity for battery in self.batteries]))
+        return self._power_capacity
 
     @property
     def state(self) -> BatteryState:
@@ -70,24 +132,64 @@ class Site:
         as discharging.
         """
 
+        if not self._state_dirty:
+            return self._state_cache
+
+        self._state_cache = BatteryState.IDLE
         for battery in self.batteries:
-            if battery.state == BatteryState.CHARGING:
-                return BatteryState.CHARGING
-            elif battery.state == BatteryState.DISCHARGING:
-                return BatteryState.DISCHARGING
+            if battery.state != BatteryState.IDLE:
+                self._state_cache = battery.state
+                break
 
-        return BatteryState.IDLE
+        self._state_dirty = False
+        return self._state_cache
 
     @property
-    def power_input(self) -> List[Decimal]:
+    def power_input(self) -> np.ndarray:
         """
         Power input is the sum of each power input step for each battery
+
+        Only the increments since the last call are summed. The result is a
+        read-only view of the site's cached totals.
         """
+        start, end = self._power_input_len, self._timestep
+        if start < end:
+            self._power_input[start:end] = self._inputs[:, start:end].sum(axis=0)
+            self._power_input_len = end
+
+        power_input = self._power_input[:end]
+        power_input.flags.writeable = False
+        return power_input
 
-        # create list of lists
-        battery_input_lists = [battery.battery_inputs for battery in self.batteries]
+    def increment(self):
+        """
+        Updates every battery in the site for each time increment.
 
-        return [Decimal(sum(x)) for x in zip(*battery_input_lists)]
+        Battery inputs and outputs for the increment are recorded in the
+        site history.
+        """
+        if self._timestep == self._inputs.shape[1]:
+            self._grow_history()
+
+        self._advance(
+            self._states,
+            self._power_per_minute,
+            self._caps,
+            self._inputs,
+            self._outputs,
+            self._timestep,
+        )
+        self._timestep += 1
+
+    def _grow_history(self):
+        """
+        Doubles the number of time increments the site history can hold
+        """
+        self._inputs = np.hstack((self._inputs, np.zeros_like(self._inputs)))
+        self._outputs = np.hstack((self._outputs, np.zeros_like(self._outputs)))
+        self._power_input = np.hstack(
+            (self._power_input, np.zeros_like(self._power_input))
+        )
 
     def charge(self, rate):
         """
@@ -0,0 +1,73 @@
+"""
+Behavioural checks for standalone batteries
+"""
+import numpy as np
+import pytest
+
+from battery import HISTORY_CHUNK, GridBattery
+
+PER_MINUTE = 2500.0 / 60
+
+
+def test_running_totals():
+    battery = GridBattery()
+
+    battery.discharge()
+    for _ in range(3):
+        battery.increment()
+    battery.charge()
+    battery.increment()
+    battery.idle()
+    battery.increment()
+
+    assert battery._input_total == pytest.approx(5000.0 + PER_MINUTE)
+    assert battery._output_total == pytest.approx(3 * PER_MINUTE)
+    assert battery.current_capacity == pytest.approx(5000.0 - 2 * PER_MINUTE)
+    assert type(battery.current_capacity) is float
+
+
+def test_history_not_recorded_by_default():
+    battery = GridBattery()
+    battery.discharge()
+    battery.increment()
+
+    assert battery.history is None
+
+
+def test_history_grows_past_history_chunk():
+    battery = GridBattery(record_history=True)
+    battery.discharge()
+    battery.increment()
+    battery.idle()
+
+    steps = HISTORY_CHUNK + 10
+    for _ in range(steps):
+        battery.increment()
+
+    history = battery.history
+    assert len(history) == steps + 1
+    assert history[0] == pytest.approx(-PER_MINUTE)
+    np.testing.assert_array_equal(history[1:], 0.0)
+
+
+def test_state_of_charge():
+    battery = GridBattery()
+    assert battery.state_of_charge == 1.0
+
+    battery.discharge()
+    for _ in range(60):
+        battery.increment()
+
+    assert battery.state_of_charge == pytest.approx(0.5)
+
+
+def test_battery_ids_are_unique():
+    ids = [GridBattery().battery_id for _ in range(5)]
+    assert len(set(ids)) == 5
+
+
+def test_str_shows_state_name():
+    battery = GridBattery()
+    battery.discharge()
+
+    assert "State: DISCHARGING" in str(battery)
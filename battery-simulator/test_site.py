@@ -0,0 +1,159 @@
+"""
+Behavioural checks for sites, the site kernels and the charging strategies
+"""
+import importlib.util
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from battery import HISTORY_CHUNK, BatteryState, GridBattery
+from charging_strategy import LowestToHighestChargingStrategy, RandomChargingStrategy
+
+# site.py shares its name with the standard library site module, which is
+# always imported first, so load it from its path instead
+_spec = importlib.util.spec_from_file_location(
+    "battery_site", Path(__file__).with_name("site.py")
+)
+battery_site = importlib.util.module_from_spec(_spec)
+sys.modules["battery_site"] = battery_site
+_spec.loader.exec_module(battery_site)
+Site = battery_site.Site
+
+PER_MINUTE = 2500.0 / 60
+
+
+def make_site(n=3, parallel=False):
+    batteries = [GridBattery() for _ in range(n)]
+    return Site(batteries, "test", parallel=parallel), batteries
+
+
+def test_discharge_then_charge_round_trip():
+    site, batteries = make_site()
+
+    batteries[0].discharge()
+    for _ in range(10):
+        site.increment()
+    assert batteries[0].current_capacity == pytest.approx(5000.0 - 10 * PER_MINUTE)
+    assert site.state == BatteryState.DISCHARGING
+
+    batteries[0].charge()
+    for _ in range(10):
+        site.increment()
+    assert batteries[0].current_capacity == pytest.approx(5000.0)
+    assert site.current_capacity == pytest.approx(15000.0)
+    assert site.state == BatteryState.CHARGING
+
+    batteries[0].idle()
+    assert site.state == BatteryState.IDLE
+
+
+def test_power_input_grows_past_history_chunk():
+    site, batteries = make_site()
+    batteries[1].discharge()
+    site.increment()
+    batteries[1].charge()
+
+    steps = HISTORY_CHUNK + 10
+    for step in range(steps):
+        site.increment()
+        if step == 100:
+            assert len(site.power_input) == 102
+
+    power_input = site.power_input
+    assert len(power_input) == steps + 1
+    assert power_input[0] == 0.0
+    np.testing.assert_allclose(power_input[1:], PER_MINUTE)
+    assert not power_input.flags.writeable
+
+
+def test_battery_in_site_is_incremented_by_site():
+    site, batteries = make_site()
+    with pytest.raises(RuntimeError):
+        batteries[0].increment()
+
+
+def test_history_of_site_battery():
+    batteries = [GridBattery(record_history=True), GridBattery()]
+    batteries[0].discharge()
+    batteries[0].increment()
+    site = Site(batteries, "test")
+
+    for _ in range(3):
+        site.increment()
+    batteries[0].idle()
+    site.increment()
+
+    np.testing.assert_allclose(batteries[0].history, [-PER_MINUTE] * 4 + [0.0])
+    assert batteries[1].history is None
+
+
+def test_battery_cannot_join_two_sites():
+    site, batteries = make_site()
+    with pytest.raises(ValueError):
+        Site([batteries[0]], "other")
+
+    assert batteries[0]._site is site
+
+
+def test_capacity_setters_update_site():
+    site, batteries = make_site()
+    batteries[1].discharge()
+    batteries[1].power_capacity = 60.0
+    batteries[2].energy_capacity = 100.0
+    site.increment()
+
+    assert batteries[1].current_capacity == pytest.approx(4999.0)
+    assert site.power_capacity == pytest.approx(5060.0)
+    assert site.energy_capacity == pytest.approx(10100.0)
+
+
+def test_lowest_to_highest_strategy():
+    site, batteries = make_site()
+    strategy = LowestToHighestChargingStrategy()
+    batteries[1].discharge()
+    site.increment()
+
+    assert strategy.determine_charge_battery(0, site) is batteries[1]
+    assert strategy.determine_discharge_battery(0, site) is batteries[0]
+
+
+def test_random_strategy_only_picks_eligible_batteries():
+    site, batteries = make_site()
+    strategy = RandomChargingStrategy()
+    batteries[0].discharge()
+    batteries[1].discharge()
+
+    picks = {strategy.determine_discharge_battery(0, site) for _ in range(50)}
+    assert picks == {batteries[2]}
+
+
+def test_empty_site():
+    site, _ = make_site(0)
+    site.increment()
+
+    assert site.current_capacity == 0.0
+    assert site.energy_capacity == 0.0
+    assert site.state == BatteryState.IDLE
+    assert len(site.power_input) == 1
+    with pytest.raises(ValueError):
+        LowestToHighestChargingStrategy().determine_charge_battery(0, site)
+    with pytest.raises(ValueError):
+        RandomChargingStrategy().determine_discharge_battery(0, site)
+
+
+def test_parallel_kernel_matches_serial():
+    serial, serial_batteries = make_site(50)
+    parallel, parallel_batteries = make_site(50, parallel=True)
+    for i in range(1, 50, 3):
+        serial_batteries[i].discharge()
+        parallel_batteries[i].discharge()
+
+    for _ in range(200):
+        serial.increment()
+        parallel.increment()
+
+    np.testing.assert_array_equal(serial._caps, parallel._caps)
+    np.testing.assert_array_equal(serial.power_input, parallel.power_input)
+    np.testing.assert_array_equal(serial._outputs, parallel._outputs)